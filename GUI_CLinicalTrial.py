@@ -1,12 +1,38 @@
 # python
 # GUI_CLinicalTrial.py — run with: streamlit run GUI_CLinicalTrial.py
+import functools
+import hashlib
+import heapq
+import json
+import os
 import re
+import sqlite3
+import tempfile
+import time
+from operator import itemgetter
+from pathlib import Path
+
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # faster decoding of large result pages
+except ImportError:  # optional; fall back to requests' stdlib json
+    orjson = None
+
+try:
+    import requests_cache  # HTTP cache honouring ETag/Last-Modified revalidation
+except ImportError:  # optional; cache misses then go straight to the network
+    requests_cache = None
 
 st.set_page_config(page_title="Brain Trials Finder", layout="wide")
 
 STATUSES = ["RECRUITING", "NOT_YET_RECRUITING"]
+TOP_N = 50  # results shown per search
+UA = {"User-Agent": "BrainTrialsFinder-Web/1.0 (+https://clinicaltrials.gov)"}
+_EMPTY = {}  # shared read-only default for missing modules; never mutate
 
 DEFAULT_DIAG_TERMS = {
     "Glioblastoma": ["glioblastoma", "GBM", "grade 4 astrocytoma"],
@@ -14,6 +40,23 @@ DEFAULT_DIAG_TERMS = {
     "Anaplastic astrocytoma": ["anaplastic astrocytoma", "grade 3 astrocytoma"],
 }
 
+# protocolSection modules this page reads; nothing else is requested
+STUDY_MODULES = (
+    "identificationModule",
+    "statusModule",
+    "sponsorCollaboratorsModule",
+    "descriptionModule",
+    "conditionsModule",
+    "designModule",
+    "eligibilityModule",
+    "contactsLocationsModule",
+)
+STUDY_FIELDS = ",".join(f"protocolSection.{m}" for m in STUDY_MODULES)
+
+# search results persisted across server restarts; entries older than CACHE_TTL are refetched
+CACHE_DIR = Path("~/.cache/brain_trials").expanduser()
+CACHE_TTL = 3600
+
 
 def ensure_list(v):
     if isinstance(v, list):
@@ -23,10 +66,7 @@ def ensure_list(v):
     return [v]
 
 
-def mentions(text: str, needle: str) -> bool:
-    if not text:
-        return False
-    return needle.lower() in text.lower()
+_AGE_RE = re.compile(r"(\d+)")
 
 
 def _to_int(v):
@@ -36,57 +76,151 @@ def _to_int(v):
         if isinstance(v, (int, float)):
             return int(v)
         # Extract first integer from strings like "18 Years"
-        m = re.search(r"(\d+)", str(v))
+        m = _AGE_RE.search(str(v))
         return int(m.group(1)) if m else None
     except Exception:
         return None
 
 
-def build_terms(diagnosis: str, keywords: str):
+@functools.lru_cache(maxsize=64)
+def _keyword_needles(keywords: str) -> tuple:
+    """Lower-cased keyword needles; split once per keywords string instead of once per study."""
+    return tuple(k.strip().lower() for k in (keywords or "").split(",") if k.strip())
+
+
+@functools.lru_cache(maxsize=64)
+def build_terms(diagnosis: str, keywords: str) -> tuple:
     base = DEFAULT_DIAG_TERMS.get(diagnosis, [])
     extra = [k.strip() for k in (keywords or "").split(",") if k.strip()]
-    terms = list(dict.fromkeys([*base, *extra]))  # de-duplicate preserve order
-    return terms or ["brain tumor"]
+    terms = tuple(dict.fromkeys([*base, *extra]))  # de-duplicate preserve order
+    return terms or ("brain tumor",)
 
 
+@functools.lru_cache(maxsize=64)
 def build_expr(diagnosis: str, keywords: str) -> str:
     terms = build_terms(diagnosis, keywords)
     # Simple OR query; v2 tokenizes internally
     return " OR ".join(f'"{t}"' if " " in t else t for t in terms)
 
 
+def age_filter(age) -> str:
+    """`filter.advanced` expression keeping studies whose age limits admit `age` (or have none)."""
+    if age is None:
+        return ""
+    return (
+        f"(AREA[MinimumAge]MISSING OR AREA[MinimumAge]RANGE[MIN, {int(age)} years])"
+        f" AND (AREA[MaximumAge]MISSING OR AREA[MaximumAge]RANGE[{int(age)} years, MAX])"
+    )
+
+
+@st.cache_resource
+def _http_session() -> requests.Session:
+    # One pooled session per server process, so connections survive script reruns
+    session = None
+    if requests_cache is not None:
+        # Expired entries are revalidated with a conditional GET instead of refetched
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            session = requests_cache.CachedSession(
+                str(CACHE_DIR / "ctgov_http"), backend="sqlite", expire_after=CACHE_TTL, cache_control=True
+            )
+        except (OSError, sqlite3.Error):
+            session = None  # cache dir not writable or database locked; go uncached
+    if session is None:
+        session = requests.Session()
+    session.headers.update(UA)
+    # Retry transient failures; the last response is still returned so raise_for_status reports it
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry))
+    return session
+
+
+def _cache_path(*key) -> Path:
+    digest = hashlib.blake2b(json.dumps(key).encode("utf-8"), digest_size=16).hexdigest()
+    return CACHE_DIR / f"{digest}.json"
+
+
+def _disk_get(path: Path):
+    try:
+        if time.time() - path.stat().st_mtime > CACHE_TTL:
+            return None
+        raw = path.read_bytes()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except (OSError, ValueError):
+        return None
+
+
+def _disk_prune(now: float) -> None:
+    # Expired entries are never read again; drop them so the directory doesn't grow forever.
+    # Only our own files: the HTTP cache database lives in the same directory
+    for p in CACHE_DIR.iterdir():
+        if p.suffix in (".json", ".tmp"):
+            try:
+                if now - p.stat().st_mtime > CACHE_TTL:
+                    p.unlink()
+            except OSError:
+                pass
+
+
+def _disk_put(path: Path, value) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        raw = orjson.dumps(value) if orjson is not None else json.dumps(value).encode("utf-8")
+        # A unique temp file per write, since other sessions' threads may store the same key
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(raw)
+            os.replace(tmp, path)  # atomic, so a concurrent reader never sees half a file
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        _disk_prune(time.time())
+    except (OSError, TypeError):
+        pass  # cache is best-effort
+
+
 @st.cache_data(ttl=3600)
-def ctgov_search(expr: str, statuses, page_size: int = 100, max_pages: int = 5):
+def ctgov_search(expr: str, statuses, page_size: int = 1000, max_pages: int = 1, advanced: str = ""):
     """Return a list of study dicts from ClinicalTrials.gov v2."""
+    cache_file = _cache_path(expr, list(statuses), page_size, max_pages, advanced)
+    cached = _disk_get(cache_file)
+    if cached is not None:
+        return cached
     url = "https://clinicaltrials.gov/api/v2/studies"
     all_studies = []
     token = None
+    session = _http_session()
     for _ in range(max_pages):
         params = {
             "query.term": expr,
             "pageSize": page_size,
             "filter.overallStatus": ",".join(statuses),
+            "fields": STUDY_FIELDS,
         }
+        if advanced:
+            params["filter.advanced"] = advanced
         if token:
             params["pageToken"] = token
-        r = requests.get(url, params=params, timeout=30)
+        r = session.get(url, params=params, timeout=30)
         r.raise_for_status()
-        data = r.json() or {}
+        data = (orjson.loads(r.content) if orjson is not None else r.json()) or _EMPTY
         studies = data.get("studies") or []
         all_studies.extend(studies)
         token = data.get("nextPageToken")
         if not token:
             break
+    _disk_put(cache_file, all_studies)
     return all_studies
 
 
 def extract_row(study: dict) -> dict:
-    ps = (study.get("protocolSection") or {})
-    idm = (ps.get("identificationModule") or {})
-    scm = (ps.get("statusModule") or {})
-    dsm = (ps.get("designModule") or {})
-    cdnm = (ps.get("conditionsModule") or {})
-    slm = (ps.get("sponsorCollaboratorsModule") or {})
+    ps = (study.get("protocolSection") or _EMPTY)
+    idm = (ps.get("identificationModule") or _EMPTY)
+    scm = (ps.get("statusModule") or _EMPTY)
+    dsm = (ps.get("designModule") or _EMPTY)
+    cdnm = (ps.get("conditionsModule") or _EMPTY)
+    slm = (ps.get("sponsorCollaboratorsModule") or _EMPTY)
 
     title = (idm.get("officialTitle") or idm.get("briefTitle") or "").strip()
     nct = (idm.get("nctId") or "").strip()
@@ -108,7 +242,7 @@ def extract_row(study: dict) -> dict:
     conditions = ", ".join(ensure_list(cdnm.get("conditions")))
 
     sponsor = ""
-    lead = slm.get("leadSponsor") or {}
+    lead = slm.get("leadSponsor") or _EMPTY
     if isinstance(lead, dict):
         sponsor = (lead.get("name") or "").strip()
 
@@ -122,58 +256,244 @@ def extract_row(study: dict) -> dict:
     }
 
 
-def score_trial(study: dict, intake: dict):
-    ps = (study.get("protocolSection") or {})
-    scm = (ps.get("statusModule") or {})
-    dsm = (ps.get("designModule") or {})
-    elm = (ps.get("eligibilityModule") or {})
-    idm = (ps.get("identificationModule") or {})
-
+def _base_score(status: str, phases_up: list) -> int:
+    """Points for recruitment status and phase; these never depend on the intake."""
     s = 0
-    reasons = []
-
-    status = (scm.get("overallStatus") or "")
     if status == "RECRUITING":
         s += 15
     elif status == "NOT_YET_RECRUITING":
         s += 8
-
-    phases = ensure_list(dsm.get("phases"))
-    if any("PHASE3" in str(p).upper() for p in phases):
+    if any("PHASE3" in p for p in phases_up):
         s += 12
-    if any("PHASE2" in str(p).upper() for p in phases):
+    if any("PHASE2" in p for p in phases_up):
         s += 8
+    return s
+
+
+def _trial_features(study: dict) -> dict:
+    """Intake-independent facts about a study that scoring needs."""
+    ps = (study.get("protocolSection") or _EMPTY)
+    scm = (ps.get("statusModule") or _EMPTY)
+    dsm = (ps.get("designModule") or _EMPTY)
+    elm = (ps.get("eligibilityModule") or _EMPTY)
+    idm = (ps.get("identificationModule") or _EMPTY)
 
-    # Age checks
     min_age_raw = elm.get("minimumAge")
     max_age_raw = elm.get("maximumAge")
-    min_age = _to_int(min_age_raw)
-    max_age = _to_int(max_age_raw)
-    age = int(intake.get("age") or 0)
-    if min_age is not None and age < min_age:
-        reasons.append(f"Age below minimum ({min_age_raw}).")
-        s -= 30
-    if max_age is not None and age > max_age:
-        reasons.append(f"Age above maximum ({max_age_raw}).")
-        s -= 30
-
-    # KPS heuristic from criteria text
     crit = elm.get("eligibilityCriteria") or ""
+    title = (idm.get("briefTitle") or idm.get("officialTitle") or "")
+    summary = (ps.get("descriptionModule", _EMPTY) or _EMPTY).get("briefSummary") or ""
+    phases_up = [str(p).upper() for p in ensure_list(dsm.get("phases"))]
+    return {
+        "base_score": _base_score(scm.get("overallStatus") or "", phases_up),
+        "min_age_raw": min_age_raw,
+        "max_age_raw": max_age_raw,
+        "min_age": _to_int(min_age_raw),
+        "max_age": _to_int(max_age_raw),
+        "mentions_karnofsky": "karnofsky" in crit.lower(),
+        "blob": " ".join([title, summary]).lower(),
+    }
+
+
+PARSE_CACHE_MAX = 20000  # parsed studies kept across queries before the store is reset
+
+
+@st.cache_resource
+def _parsed_store() -> dict:
+    # Shared, uncopied dict: (nctId, last update) -> parsed fields, reused across different queries
+    return {}
+
+
+def _parse_study(study: dict, store: dict) -> dict:
+    ps = (study.get("protocolSection") or _EMPTY)
+    nct = ((ps.get("identificationModule") or _EMPTY).get("nctId") or "")
+    updated = (((ps.get("statusModule") or _EMPTY).get("lastUpdatePostDateStruct") or _EMPTY).get("date") or "")
+    key = (nct, updated)
+    rec = store.get(key) if nct else None
+    if rec is None:
+        rec = {**_trial_features(study), **extract_row(study)}
+        if nct:
+            if len(store) >= PARSE_CACHE_MAX:
+                store.clear()
+            store[key] = rec
+    return rec
+
+
+def flatten_studies(studies: list) -> dict:
+    """Walk the study dicts once into parallel columns (one list per field).
+
+    Column i of every list describes the same study. Studies that fail to parse are dropped.
+    """
+    store = _parsed_store()
+    cols = {}
+    n = 0
+    for study in studies:
+        try:
+            rec = {**_parse_study(study, store), "study": study}
+        except Exception:
+            continue
+        for k, v in rec.items():
+            cols.setdefault(k, [None] * n).append(v)
+        n += 1
+    return cols
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def search_table(expr: str, statuses, page_size: int = 1000, max_pages: int = 1, advanced: str = ""):
+    """Fetch and flatten once per query; reruns with the same query reuse the columns."""
+    studies = ctgov_search(expr, statuses, page_size=page_size, max_pages=max_pages, advanced=advanced)
+    return len(studies), flatten_studies(studies)
+
+
+def score_columns(cols: dict, intake: dict, top_n: int = 0):
+    """Score every study in a flatten_studies table. Returns (scores, reasons) lists.
+
+    With `top_n`, studies that provably cannot reach the current top `top_n` skip the
+    keyword scan and get None for both score and reasons.
+    """
+    age = int(intake.get("age") or 0)
     kps = int(intake.get("kps") or 0)
-    if mentions(crit, "Karnofsky") and kps < 70:
-        s -= 10
-        reasons.append("Requires KPS ≥70.")
+    needles = _keyword_needles(intake.get("keywords") or "")
+
+    kw_max = 2 * len(needles)
+    top = []  # min-heap of the best `top_n` scores so far
+
+    scores = []
+    all_reasons = []
+    for base, min_age, max_age, min_age_raw, max_age_raw, karnofsky, blob in zip(
+        cols.get("base_score", []),
+        cols.get("min_age", []),
+        cols.get("max_age", []),
+        cols.get("min_age_raw", []),
+        cols.get("max_age_raw", []),
+        cols.get("mentions_karnofsky", []),
+        cols.get("blob", []),
+    ):
+        s = base
+        reasons = []
+
+        # Age checks
+        if min_age is not None and age < min_age:
+            reasons.append(f"Age below minimum ({min_age_raw}).")
+            s -= 30
+        if max_age is not None and age > max_age:
+            reasons.append(f"Age above maximum ({max_age_raw}).")
+            s -= 30
+
+        # KPS heuristic from criteria text
+        if karnofsky and kps < 70:
+            s -= 10
+            reasons.append("Requires KPS ≥70.")
+
+        if top_n and len(top) >= top_n and s + kw_max < top[0]:
+            scores.append(None)
+            all_reasons.append(None)
+            continue
 
-    # Keyword bonus
-    title = (idm.get("briefTitle") or idm.get("officialTitle") or "")
-    summary = (ps.get("descriptionModule", {}) or {}).get("briefSummary") or ""
-    keywords = [k.strip() for k in (intake.get("keywords") or "").split(",") if k.strip()]
-    blob = " ".join([title, summary])
-    for kw in keywords:
-        if mentions(blob, kw):
-            s += 2
+        # Keyword bonus
+        for kw in needles:
+            if kw in blob:
+                s += 2
 
-    return s, reasons
+        if top_n:
+            if len(top) < top_n:
+                heapq.heappush(top, s)
+            else:
+                heapq.heappushpop(top, s)
+        scores.append(s)
+        all_reasons.append(reasons)
+    return scores, all_reasons
+
+
+def trial_detail(row: tuple):
+    """Full card for one result: metadata, contacts/locations and score reasons."""
+    sc, title, nct, status, phases, conds, sponsor, reasons, url, study = row
+    with st.container(border=True):
+        if url:
+            st.markdown(f"**[{title}]({url})**")
+        else:
+            st.markdown(f"**{title}**")
+        meta = f"NCT: {nct or '—'} · Sponsor: {sponsor or '—'} · Status: {status or '—'} · Phases: {phases or '—'} · Score: {sc}"
+        st.write(meta)
+        if conds:
+            st.write(f"Conditions: {conds}")
+
+        with st.expander("Contacts and Locations", expanded=True):
+            ps = (study.get("protocolSection") or _EMPTY)
+            clm = (ps.get("contactsLocationsModule") or _EMPTY)
+
+            centrals = ensure_list(clm.get("centralContacts"))
+            if centrals:
+                st.write("Central Contacts:")
+                for c in centrals:
+                    parts = [c.get("name"), c.get("role"), c.get("phone"), c.get("email")]
+                    st.write(" - " + " | ".join([p for p in parts if p]))
+
+            officials = ensure_list(clm.get("overallOfficials"))
+            if officials:
+                st.write("Overall Officials:")
+                for o in officials:
+                    parts = [o.get("name"), o.get("role"), o.get("affiliation")]
+                    st.write(" - " + " | ".join([p for p in parts if p]))
+
+            locs = ensure_list(clm.get("locations"))
+            if locs:
+                st.write("Locations:")
+                for L in locs:
+                    facility = (L.get("locationFacility") or "").strip()
+                    city = (L.get("locationCity") or "").strip()
+                    state = (L.get("locationState") or "").strip()
+                    country = (L.get("locationCountry") or "").strip()
+                    status_l = (L.get("status") or "").strip()
+                    site_line = ", ".join([p for p in [facility, city, state, country] if p])
+                    if site_line:
+                        st.write(f" - {site_line}" + (f" (status: {status_l})" if status_l else ""))
+                    lcontacts = ensure_list(L.get("contacts")) or ensure_list(L.get("locationContacts"))
+                    for lc in lcontacts:
+                        parts = [lc.get("name"), lc.get("role"), lc.get("phone"), lc.get("email")]
+                        parts = [p for p in parts if p]
+                        if parts:
+                            st.write("    • " + " | ".join(parts))
+
+        if reasons:
+            with st.expander("Why this score?"):
+                for r in reasons:
+                    st.write(f"- {r}")
+
+
+@st.fragment
+def results_panel(rows: list, n_studies: int):
+    """Render the ranked results. Widgets in here rerun only this panel, not fetch and scoring."""
+    st.caption(f"Found {n_studies} studies; showing top {len(rows)} by score. Select a row for contacts.")
+
+    # One table element instead of several widgets per trial; details only for the selected row
+    event = st.dataframe(
+        [
+            {
+                "Score": sc,
+                "Title": title,
+                "Status": status,
+                "Phases": phases,
+                "Conditions": conds,
+                "Sponsor": sponsor,
+                "Reasons": "; ".join(reasons),
+                "Link": url,
+            }
+            for sc, title, nct, status, phases, conds, sponsor, reasons, url, study in rows
+        ],
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Score": st.column_config.ProgressColumn("Match", min_value=0, max_value=100, format="%d"),
+            "Link": st.column_config.LinkColumn("Study"),
+        },
+        key="results_table",
+        on_select="rerun",
+        selection_mode="single-row",
+    )
+    selected = event.selection.rows
+    if selected and selected[0] < len(rows):
+        trial_detail(rows[selected[0]])
 
 
 # UI
@@ -189,6 +509,7 @@ with st.sidebar:
     age = st.number_input("Age", min_value=1, max_value=100, value=55)
     kps = st.slider("Karnofsky (KPS)", min_value=40, max_value=100, step=10, value=80)
     prior_bev = st.checkbox("Prior bevacizumab", value=False)
+    strict_age = st.checkbox("Only trials that accept this age", value=False)
     keywords = st.text_input("Keywords (comma-separated)", value="immunotherapy,vaccine,device")
     do_search = st.button("Search", type="primary")
 
@@ -196,7 +517,7 @@ with st.sidebar:
 if do_search or "did_first" not in st.session_state:
     st.session_state["did_first"] = True
     expr = build_expr(diagnosis, keywords)
-    studies = ctgov_search(expr, STATUSES, page_size=100, max_pages=5)
+    n_studies, table = search_table(expr, STATUSES, advanced=age_filter(age) if strict_age else "")
 
     intake = {
         "age": age,
@@ -207,83 +528,29 @@ if do_search or "did_first" not in st.session_state:
         "diagnosis": diagnosis,
     }
 
+    scores, all_reasons = score_columns(table, intake, top_n=TOP_N)
     rows = []
-    for sdict in studies:
-        try:
-            sc, reasons = score_trial(sdict, intake)
-            row = extract_row(sdict)
-            nct = row.get("nct") or ""
-            url = f"https://clinicaltrials.gov/study/{nct}" if nct else ""
-            rows.append(
-                (
-                    sc,
-                    row.get("title", ""),
-                    nct,
-                    row.get("status", ""),
-                    row.get("phases", ""),
-                    row.get("conditions", ""),
-                    row.get("sponsor", ""),
-                    reasons,
-                    url,
-                    sdict,
-                )
-            )
-        except Exception:
+    for i, sc in enumerate(scores):
+        if sc is None:
             continue
+        nct = table["nct"][i] or ""
+        url = f"https://clinicaltrials.gov/study/{nct}" if nct else ""
+        rows.append(
+            (
+                sc,
+                table["title"][i],
+                nct,
+                table["status"][i],
+                table["phases"][i],
+                table["conditions"][i],
+                table["sponsor"][i],
+                all_reasons[i],
+                url,
+                table["study"][i],
+            )
+        )
 
-    rows = sorted(rows, key=lambda x: -x[0])[:50]
-
-    st.caption(f"Found {len(studies)} studies; showing top {len(rows)} by score.")
+    # Partial sort; ties keep fetch order exactly like a stable sort would
+    rows = heapq.nlargest(TOP_N, rows, key=itemgetter(0))
 
-    for sc, title, nct, status, phases, conds, sponsor, reasons, url, study in rows:
-        with st.container(border=True):
-            if url:
-                st.markdown(f"**[{title}]({url})**")
-            else:
-                st.markdown(f"**{title}**")
-            meta = f"NCT: {nct or '—'} · Sponsor: {sponsor or '—'} · Status: {status or '—'} · Phases: {phases or '—'} · Score: {sc}"
-            st.write(meta)
-            if conds:
-                st.write(f"Conditions: {conds}")
-
-            with st.expander("Contacts and Locations"):
-                ps = (study.get("protocolSection") or {})
-                clm = (ps.get("contactsLocationsModule") or {})
-
-                centrals = ensure_list(clm.get("centralContacts"))
-                if centrals:
-                    st.write("Central Contacts:")
-                    for c in centrals:
-                        parts = [c.get("name"), c.get("role"), c.get("phone"), c.get("email")]
-                        st.write(" - " + " | ".join([p for p in parts if p]))
-
-                officials = ensure_list(clm.get("overallOfficials"))
-                if officials:
-                    st.write("Overall Officials:")
-                    for o in officials:
-                        parts = [o.get("name"), o.get("role"), o.get("affiliation")]
-                        st.write(" - " + " | ".join([p for p in parts if p]))
-
-                locs = ensure_list(clm.get("locations"))
-                if locs:
-                    st.write("Locations:")
-                    for L in locs:
-                        facility = (L.get("locationFacility") or "").strip()
-                        city = (L.get("locationCity") or "").strip()
-                        state = (L.get("locationState") or "").strip()
-                        country = (L.get("locationCountry") or "").strip()
-                        status_l = (L.get("status") or "").strip()
-                        site_line = ", ".join([p for p in [facility, city, state, country] if p])
-                        if site_line:
-                            st.write(f" - {site_line}" + (f" (status: {status_l})" if status_l else ""))
-                        lcontacts = ensure_list(L.get("contacts")) or ensure_list(L.get("locationContacts"))
-                        for lc in lcontacts:
-                            parts = [lc.get("name"), lc.get("role"), lc.get("phone"), lc.get("email")]
-                            parts = [p for p in parts if p]
-                            if parts:
-                                st.write("    • " + " | ".join(parts))
-
-            if reasons:
-                with st.expander("Why this score?"):
-                    for r in reasons:
-                        st.write(f"- {r}")
+    results_panel(rows, n_studies)
@@ -4,11 +4,19 @@ import csv
 import json
 from typing import List, Dict, Any
 
+try:
+    import orjson  # faster JSON output for large result sets
+except ImportError:  # optional; fall back to the stdlib encoder
+    orjson = None
+
 from ctgov_client import (
     DEFAULT_DIAG_TERMS,
+    MIN_SCORE,
     build_terms,
-    fetch_all_terms,
+    fetch_terms,
+    make_study,
     score_trial,
+    study_url,
     extract_row,
 )
 
@@ -34,10 +42,13 @@ def save_results(rows: List[Dict[str, Any]], csv_path: str, json_path: str):
     with open(csv_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=keys)
         writer.writeheader()
-        for r in rows:
-            writer.writerow({k: r.get(k, "") for k in keys})
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(rows, f, indent=2, ensure_ascii=False)
+        writer.writerows({k: r.get(k, "") for k in keys} for r in rows)
+    if orjson is not None:
+        with open(json_path, "wb") as f:
+            f.write(orjson.dumps(rows, option=orjson.OPT_INDENT_2))
+    else:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
     print(f"Wrote {len(rows)} studies to {csv_path} and {json_path}")
 
 
@@ -65,12 +76,28 @@ def main():
         choices=["Newly diagnosed", "Recurrent"],
         help="Disease setting",
     )
-    parser.add_argument("--country", default="", help="Filter: require location country containing this text (case-insensitive)")
-    parser.add_argument("--require-country", action="store_true", help="If set, require at least one site in the given country text")
+    parser.add_argument(
+        "--strict-age",
+        action="store_true",
+        help="Only fetch trials whose age limits include --age (filtered server-side)",
+    )
+    parser.add_argument("--country", default="", help="Filter: country of a site, matched on whole words of the country name, e.g. 'United States' (case-insensitive)")
+    parser.add_argument("--require-country", action="store_true", help="If set, require at least one site in the given country")
+    parser.add_argument(
+        "--strict-country",
+        action="store_true",
+        help="Also re-check each study's site countries locally after the server-side country filter",
+    )
+    parser.add_argument(
+        "--min-score",
+        type=int,
+        default=MIN_SCORE,
+        help="Leave out trials scoring below this (0-100; the default keeps every trial)",
+    )
     parser.add_argument("--csv", default="neuro_onc_trials.csv", help="CSV output path")
     parser.add_argument("--json", default="neuro_onc_trials.json", help="JSON output path")
-    parser.add_argument("--page-size", type=int, default=100, help="Results per page per term (max 1000)")
-    parser.add_argument("--pages", type=int, default=5, help="Max pages to fetch per term")
+    parser.add_argument("--page-size", type=int, default=1000, help="Results per page per term (max 1000)")
+    parser.add_argument("--pages", type=int, default=1, help="Max pages to fetch per term")
     args = parser.parse_args()
 
     terms = build_terms(args.diagnosis, args.keywords)
@@ -79,20 +106,30 @@ def main():
     if args.keywords:
         print("  Extra keywords:", args.keywords)
 
-    studies = fetch_all_terms(terms, STATUSES, page_size=args.page_size, max_pages=args.pages)
+    studies, truncated = fetch_terms(
+        terms,
+        STATUSES,
+        page_size=args.page_size,
+        max_pages=args.pages,
+        country=args.country if args.require_country else "",
+        age=args.age if args.strict_age else None,
+    )
 
     rows: List[Dict[str, Any]] = []
     skipped = 0
+    hidden = 0
     for s in studies:
         try:
             ps = (s.get("protocolSection", {}) or {})
             locs = ((ps.get("contactsLocationsModule", {}) or {}).get("locations") or [])
-            if args.country and args.require_country:
+            # The server already filtered by country; the local substring check is opt-in
+            if args.country and args.require_country and args.strict_country:
                 locs = [L for L in locs if args.country.lower() in (L.get("locationCountry") or "").lower()]
             if args.require_country and not locs:
                 continue
+            study = make_study(s)
             sc, reasons = score_trial(
-                s,
+                study,
                 dict(
                     age=args.age,
                     kps=args.kps,
@@ -102,10 +139,13 @@ def main():
                     diagnosis=args.diagnosis,
                 ),
             )
-            base = extract_row(s)
+            if sc < args.min_score:
+                hidden += 1
+                continue
+            base = extract_row(study)
             base["score"] = sc
             base["reasons"] = "; ".join(reasons)
-            base["url"] = f"https://clinicaltrials.gov/study/{base['nct']}" if base.get("nct") else ""
+            base["url"] = study_url(base.get("nct"))
             rows.append(base)
         except Exception:
             skipped += 1
@@ -113,6 +153,10 @@ def main():
 
     rows.sort(key=lambda x: -x.get("score", 0))
     print(f"Fetched {len(studies)} trials; showing {len(rows)} after filters. Skipped {skipped}.")
+    if hidden:
+        print(f"Left out {hidden} scoring below {args.min_score}.")
+    if truncated:
+        print("More trials matched than --pages allows; results were truncated.")
 
     save_results(rows, args.csv, args.json)
 
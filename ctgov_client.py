@@ -1,7 +1,28 @@
 # Shared client for ClinicalTrials.gov v2 API and scoring
+import functools
+import hashlib
+import json
+import os
 import re
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 import requests
-from typing import Any, Dict, List, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import orjson  # faster decoding of large result pages
+except ImportError:  # optional; fall back to requests' stdlib json
+    orjson = None
+
+try:
+    import requests_cache  # HTTP cache honouring ETag/Last-Modified revalidation
+except ImportError:  # optional; every search then goes to the network
+    requests_cache = None
 
 DEFAULT_DIAG_TERMS = {
     "Glioblastoma": ["glioblastoma", "GBM", "glioblastoma multiforme"],
@@ -16,22 +37,140 @@ DEFAULT_DIAG_TERMS = {
 }
 
 API_BASE = "https://clinicaltrials.gov/api/v2/studies"
+STUDY_URL = "https://clinicaltrials.gov/study/{}"
+# Longest OR-expression sent as one query; beyond this fall back to one query per term
+MAX_EXPR_LEN = 1000
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "brain_trials")
+HTTP_CACHE = os.path.join(CACHE_DIR, "ctgov_http")
+# Fetched study lists kept on disk between runs; older entries are fetched again
+FETCH_CACHE_DIR = os.path.join(CACHE_DIR, "fetch")
+FETCH_CACHE_TTL = 6 * 3600
+CTGOV_SCHEMA = "v2"
 UA = {"User-Agent": "BrainTrialsFinder-Desktop/1.0 (+https://clinicaltrials.gov)"}
+_EMPTY: Dict[str, Any] = {}  # shared read-only default for missing modules; never mutate
+
+# protocolSection modules read by scoring, rows and the contacts panel; nothing else is requested
+STUDY_MODULES = (
+    "identificationModule",
+    "statusModule",
+    "sponsorCollaboratorsModule",
+    "conditionsModule",
+    "designModule",
+    "eligibilityModule",
+    "contactsLocationsModule",
+)
+# `fields` projection so the API omits resultsSection, derivedSection and unused modules
+STUDY_FIELDS = ",".join(f"protocolSection.{m}" for m in STUDY_MODULES)
 
 
-def build_terms(diagnosis: str, keywords: str) -> List[str]:
+def _split_keywords(keywords: str) -> Tuple[str, ...]:
+    return tuple(k.strip() for k in (keywords or "").split(",") if k.strip())
+
+
+@functools.lru_cache(maxsize=64)
+def build_terms(diagnosis: str, keywords: str) -> Tuple[str, ...]:
+    """Search terms for a diagnosis plus extra keywords. Returned as a tuple so it can key caches."""
     terms: List[str] = []
     if diagnosis in DEFAULT_DIAG_TERMS:
         terms.extend(DEFAULT_DIAG_TERMS[diagnosis])
     else:
         terms.extend(["brain tumor", "spinal cord tumor", "CNS tumor"])
-    extra = [k.strip() for k in (keywords or "").split(",") if k.strip()]
-    return terms + extra
+    return tuple(terms) + _split_keywords(keywords)
+
+
+@functools.lru_cache(maxsize=64)
+def _score_terms(diagnosis: str, keywords: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """(diagnosis terms, keyword terms) used by score_trial, built once per intake."""
+    if diagnosis in DEFAULT_DIAG_TERMS:
+        diag_terms = tuple(DEFAULT_DIAG_TERMS[diagnosis])
+    elif diagnosis and diagnosis != "Other":
+        diag_terms = (diagnosis,)
+    else:
+        diag_terms = ("brain tumor", "CNS tumor", "spinal cord tumor")
+    return diag_terms, _split_keywords(keywords)
+
+
+def study_url(nct: str) -> str:
+    """Public page for an NCT id; empty when there is no id."""
+    return STUDY_URL.format(nct) if nct else ""
+
+
+_ESSIE_OPERATORS = frozenset({"AND", "OR", "NOT"})
+
+
+def _essie_term(term: str) -> str:
+    # Quotes can't be escaped in a query term, so drop them; phrases and operator words
+    # are quoted so they are searched literally
+    t = " ".join(term.replace('"', " ").split())
+    if " " in t or t.upper() in _ESSIE_OPERATORS or any(c in t for c in "()[]"):
+        return f'"{t}"'
+    return t
+
+
+def or_expr(terms: Sequence[str]) -> str:
+    """Join terms into one `query.term` OR-expression, quoting phrases and operator words."""
+    return " OR ".join(e for e in map(_essie_term, terms) if e.strip('"'))
+
+
+def age_filter(age: Optional[int]) -> str:
+    """`filter.advanced` expression keeping studies whose age limits admit `age` (or have none)."""
+    if age is None:
+        return ""
+    return (
+        f"(AREA[MinimumAge]MISSING OR AREA[MinimumAge]RANGE[MIN, {int(age)} years])"
+        f" AND (AREA[MaximumAge]MISSING OR AREA[MaximumAge]RANGE[{int(age)} years, MAX])"
+    )
+
 
+def country_filter(country: str) -> str:
+    """`filter.advanced` expression keeping studies with a site in `country`.
 
-def ctgov_search_one(term: str, statuses: List[str], page_size: int = 100, max_pages: int = 5) -> List[Dict[str, Any]]:
-    session = requests.Session()
+    The server matches whole words of the country name: "United States" and "United" both
+    match (the latter also United Kingdom), but "USA" or "United St" match nothing.
+    """
+    country = (country or "").replace('"', "").strip()
+    return f'AREA[LocationCountry]"{country}"' if country else ""
+
+
+def _make_session() -> requests.Session:
+    session = None
+    if requests_cache is not None:
+        # Fresh responses come from SQLite; stale ones are revalidated with a conditional GET
+        try:
+            os.makedirs(os.path.dirname(HTTP_CACHE), exist_ok=True)
+            session = requests_cache.CachedSession(
+                HTTP_CACHE, backend="sqlite", expire_after=3600, cache_control=True
+            )
+        except (OSError, sqlite3.Error):
+            session = None  # cache dir not writable or database locked; go uncached
+    if session is None:
+        session = requests.Session()
     session.headers.update(UA)
+    # Retry transient failures; the last response is still returned so raise_for_status reports it
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry))
+    return session
+
+
+# Shared across calls and worker threads so connections (and TLS handshakes) are reused
+_SESSION = _make_session()
+_SESSION_CACHED = requests_cache is not None and isinstance(_SESSION, requests_cache.CachedSession)
+
+
+def _decode(r: requests.Response) -> Dict[str, Any]:
+    # orjson reads the raw bytes directly, skipping the text decode step
+    return orjson.loads(r.content) if orjson is not None else r.json()
+
+
+def _search_pages(
+    term: str,
+    statuses: Sequence[str],
+    page_size: int,
+    max_pages: int,
+    advanced: str,
+    refresh: bool,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Fetch up to `max_pages` pages for one query; also returns True if more pages were left."""
     all_studies: List[Dict[str, Any]] = []
     page_token = None
     count = 0
@@ -41,43 +180,221 @@ def ctgov_search_one(term: str, statuses: List[str], page_size: int = 100, max_p
             "query.term": term,
             "filter.overallStatus": ",".join(statuses),
             "pageSize": page_size,
+            "fields": STUDY_FIELDS,
         }
+        if advanced:
+            params["filter.advanced"] = advanced
         if page_token:
             params["pageToken"] = page_token
-        r = session.get(API_BASE, params=params, timeout=30)
+        if refresh and _SESSION_CACHED:
+            # Bypass the HTTP cache too, otherwise a forced refresh could get the same stale response
+            r = _SESSION.get(API_BASE, params=params, timeout=30, force_refresh=True)
+        else:
+            r = _SESSION.get(API_BASE, params=params, timeout=30)
         r.raise_for_status()
-        data = r.json()
+        data = _decode(r)
         studies = data.get("studies", [])
         if not studies:
-            break
+            return all_studies, False
         all_studies.extend(studies)
         page_token = data.get("nextPageToken")
         if not page_token:
-            break
+            return all_studies, False
         count += 1
-    return all_studies
+    return all_studies, bool(page_token)
 
 
-def fetch_all_terms(terms: List[str], statuses: List[str], page_size=100, max_pages=5) -> List[Dict[str, Any]]:
-    dedup: Dict[str, Dict[str, Any]] = {}
-    for t in terms:
-        try:
-            for s in ctgov_search_one(t, statuses, page_size=page_size, max_pages=max_pages):
-                ident = (s.get("protocolSection", {}) or {}).get("identificationModule", {}) or {}
-                nct = ident.get("nctId")
-                key = nct or id(s)
-                if key not in dedup:
-                    dedup[key] = s
-        except requests.HTTPError:
+def ctgov_search_one(
+    term: str,
+    statuses: Sequence[str],
+    page_size: int = 1000,
+    max_pages: int = 1,
+    advanced: str = "",
+    refresh: bool = False,
+) -> List[Dict[str, Any]]:
+    return _search_pages(term, statuses, page_size, max_pages, advanced, refresh)[0]
+
+
+def _run_queries(
+    queries: Sequence[str],
+    statuses: Tuple[str, ...],
+    page_size: int,
+    max_pages: int,
+    advanced: str,
+    refresh: bool,
+    max_workers: int,
+) -> List[Optional[Tuple[List[Dict[str, Any]], bool]]]:
+    """Run `queries` concurrently; `_search_pages` results in query order, None for an HTTP error."""
+    results: List[Optional[Tuple[List[Dict[str, Any]], bool]]] = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as ex:
+        futures = [ex.submit(_search_pages, q, statuses, page_size, max_pages, advanced, refresh) for q in queries]
+        for fut in futures:
+            try:
+                results.append(fut.result())
+            except requests.HTTPError:
+                results.append(None)
+    return results
+
+
+def fetch_terms(
+    terms: Sequence[str],
+    statuses: Sequence[str],
+    page_size=1000,
+    max_pages=1,
+    max_workers: int = 8,
+    country: str = "",
+    combined: bool = True,
+    age: Optional[int] = None,
+    refresh: bool = False,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Fetch studies matching any of `terms`, deduplicated by NCT id; returns (studies, truncated).
+
+    By default all terms go out as a single OR query so the server does the union. With
+    `combined=False`, or when the expression would be too long for a URL, each term is
+    fetched separately and concurrently; if the combined query fails with an HTTP error, the
+    terms are retried separately so a single malformed term only loses its own results.
+    `page_size` and `max_pages` are a budget per term, so the combined query may follow up to
+    `max_pages * len(terms)` pages; `truncated` is True if any query still had pages left.
+    Queries that fail with an HTTP error are skipped so one bad query does not sink the
+    search. Studies without an NCT id are dropped.
+    If `country` is given, only studies with a site in that country are requested. If `age` is
+    given, studies whose minimum/maximum age excludes it are filtered out by the server.
+    `refresh=True` bypasses the HTTP response cache.
+    """
+    if not terms:
+        return [], False
+    statuses = tuple(statuses)
+    # Country goes through the LocationCountry field rather than query.locn, which also
+    # matches city, state and facility names
+    advanced = " AND ".join(f for f in (country_filter(country), age_filter(age)) if f)
+    results: List[Optional[Tuple[List[Dict[str, Any]], bool]]] = []
+    if combined and len(terms) > 1:
+        expr = or_expr(terms)
+        if len(expr) <= MAX_EXPR_LEN:
+            # Broad terms can fill the first page of the union on their own; keep the per-term budget
+            pages = (max_pages or 0) * len(terms)
+            results = _run_queries([expr], statuses, page_size, pages, advanced, refresh, max_workers)
+    if not results or results[0] is None:
+        results = _run_queries(list(terms), statuses, page_size, max_pages, advanced, refresh, max_workers)
+    # Merge in query order so the first-seen copy of a study is stable across runs
+    seen: Set[str] = set()
+    out: List[Dict[str, Any]] = []
+    truncated = False
+    for res in results:
+        if res is None:
             continue
-    return list(dedup.values())
+        studies, more = res
+        truncated = truncated or more
+        for s in studies:
+            ident = (s.get("protocolSection", _EMPTY) or _EMPTY).get("identificationModule", _EMPTY) or _EMPTY
+            nct = ident.get("nctId")
+            if nct and nct not in seen:
+                seen.add(nct)
+                out.append(s)
+    return out, truncated
+
+
+def fetch_all_terms(terms: Sequence[str], statuses: Sequence[str], *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+    """`fetch_terms` without the truncated flag."""
+    return fetch_terms(terms, statuses, *args, **kwargs)[0]
+
+
+def _fetch_cache_path(terms: Sequence[str], statuses: Sequence[str], kwargs: Dict[str, Any]) -> str:
+    key = json.dumps([sorted(terms), sorted(statuses), sorted(kwargs.items())], default=str)
+    return os.path.join(FETCH_CACHE_DIR, hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + ".json")
+
+
+def _prune_fetch_cache(now: float) -> None:
+    # Expired entries are never read again; drop them so the directory doesn't grow forever
+    try:
+        with os.scandir(FETCH_CACHE_DIR) as it:
+            for e in it:
+                if e.name.endswith((".json", ".tmp")):
+                    try:
+                        if now - e.stat().st_mtime > FETCH_CACHE_TTL:
+                            os.unlink(e.path)
+                    except OSError:
+                        pass
+    except OSError:
+        pass
+
+
+def cached_fetch_terms(
+    terms: Sequence[str], statuses: Sequence[str], refresh: bool = False, **kwargs: Any
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """`fetch_terms` backed by a JSON file cache under ~/.cache/brain_trials; returns (studies, truncated).
+
+    Entries are keyed by the terms, statuses and fetch options, and expire after
+    FETCH_CACHE_TTL. `refresh=True` skips the lookup, bypasses the HTTP cache and overwrites
+    the entry. Empty results are not stored, so a failed fetch is retried next time. Expired
+    entries are removed whenever a new one is written.
+    """
+    path = _fetch_cache_path(terms, statuses, kwargs)
+    if not refresh:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            entry = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            if entry.get("ctgov_schema") == CTGOV_SCHEMA and time.time() - entry.get("ts", 0) < FETCH_CACHE_TTL:
+                return entry["studies"], bool(entry.get("truncated"))
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+    studies, truncated = fetch_terms(terms, statuses, refresh=refresh, **kwargs)
+    if studies:
+        entry = {"ts": time.time(), "ctgov_schema": CTGOV_SCHEMA, "truncated": truncated, "studies": studies}
+        try:
+            os.makedirs(FETCH_CACHE_DIR, exist_ok=True)
+            # A unique temp file per write, since searches on other threads may store the same key
+            fd, tmp = tempfile.mkstemp(dir=FETCH_CACHE_DIR, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(orjson.dumps(entry) if orjson is not None else json.dumps(entry).encode("utf-8"))
+                os.replace(tmp, path)  # atomic, so a concurrent reader never sees half a file
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except (OSError, TypeError):
+            pass  # cache is best-effort
+        _prune_fetch_cache(entry["ts"])
+    return studies, truncated
+
+
+@functools.lru_cache(maxsize=4096)
+def _pat(term: str) -> "re.Pattern[str]":
+    return re.compile(rf"\b{re.escape(term)}\b", re.I)
 
 
 def mentions(txt: str, term: str) -> bool:
-    return bool(re.search(rf"\b{re.escape(term)}\b", txt or "", re.I))
+    return bool(_pat(term).search(txt or ""))
+
+
+@functools.lru_cache(maxsize=64)
+def _scanner(terms: Tuple[str, ...]) -> "re.Pattern[str]":
+    # Zero-width lookahead so every start position is tried; longest alternative first
+    alts = "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True))
+    return re.compile(rf"(?=\b(?:{alts})\b)", re.I)
+
+
+def any_term(txt: str, terms: Tuple[str, ...]) -> bool:
+    """True if `mentions` would find at least one of `terms` in `txt`; one regex pass."""
+    return bool(txt and terms and _scanner(terms).search(txt))
+
+
+def find_terms(txt: str, terms: Tuple[str, ...]) -> Set[str]:
+    """Return the subset of `terms` that `mentions` would find in `txt`, scanning the text once."""
+    found: Set[str] = set()
+    if not txt or not terms:
+        return found
+    for m in _scanner(terms).finditer(txt):
+        # The alternation reports one term per position; check which terms start here
+        pos = m.start()
+        found.update(t for t in terms if t not in found and _pat(t).match(txt, pos))
+    return found
 
 
 def as_text(obj: Any) -> str:
+    if isinstance(obj, str):  # eligibilityCriteria is almost always plain text
+        return obj
     if obj is None:
         return ""
     if isinstance(obj, dict):
@@ -90,6 +407,9 @@ def as_text(obj: Any) -> str:
     return str(obj)
 
 
+_AGE_RE = re.compile(r"(\d+)")
+
+
 def parse_age_to_int(v: Any):
     if v is None:
         return None
@@ -97,7 +417,7 @@ def parse_age_to_int(v: Any):
         return parse_age_to_int(v.get("value"))
     if isinstance(v, (int, float)):
         return int(v)
-    m = re.search(r"(\d+)", str(v))
+    m = _AGE_RE.search(str(v))
     return int(m.group(1)) if m else None
 
 
@@ -109,22 +429,41 @@ def ensure_list(v: Any):
     return [v]
 
 
-def score_trial(t: Dict[str, Any], intake: Dict[str, Any]) -> Tuple[int, List[str]]:
-    age_local = (intake or {}).get("age")
-    kps_local = (intake or {}).get("kps")
-    prior_bev_local = bool((intake or {}).get("prior_bev", False))
-    setting_local = (intake or {}).get("setting") or ""
-    keywords_local = (intake or {}).get("keywords") or ""
-    diagnosis_local = (intake or {}).get("diagnosis") or ""
+@dataclass
+class Study:
+    """The parts of a v2 study record that scoring and result rows read, pulled out once."""
+
+    # Written out rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = (
+        "nct", "title", "brief_title", "brief_title_lc", "status_raw", "phases", "conditions",
+        "crit", "crit_lc", "min_age", "max_age", "sponsor", "locations",
+    )
+
+    nct: str
+    title: str  # official title, falling back to the brief title; used for display
+    brief_title: str  # used for scoring
+    brief_title_lc: str  # lower-cased once for the fixed-phrase checks
+    status_raw: str
+    phases: List[Any]
+    conditions: List[Any]
+    crit: str
+    crit_lc: str
+    min_age: Optional[int]
+    max_age: Optional[int]
+    sponsor: str
+    locations: List[Dict[str, Any]]
 
-    if diagnosis_local in DEFAULT_DIAG_TERMS:
-        diag_terms = DEFAULT_DIAG_TERMS[diagnosis_local]
-    elif diagnosis_local and diagnosis_local != "Other":
-        diag_terms = [diagnosis_local]
-    else:
-        diag_terms = ["brain tumor", "CNS tumor", "spinal cord tumor"]
 
-    ps = (t or {}).get("protocolSection") or {}
+def make_study(raw: Dict[str, Any]) -> Study:
+    """Walk a raw study dict once; pass the result to score_trial and extract_row."""
+    ps = (raw or _EMPTY).get("protocolSection") or _EMPTY
+    idm = ps.get("identificationModule") or _EMPTY
+    scm = ps.get("statusModule") or _EMPTY
+    dsm = ps.get("designModule") or _EMPTY
+    cdnm = ps.get("conditionsModule") or _EMPTY
+    slm = ps.get("sponsorCollaboratorsModule") or _EMPTY
+    clm = ps.get("contactsLocationsModule") or _EMPTY
+
     elig = ps.get("eligibilityModule")
     crit = ""
     min_age = None
@@ -137,19 +476,63 @@ def score_trial(t: Dict[str, Any], intake: Dict[str, Any]) -> Tuple[int, List[st
     elif isinstance(elig, str):
         crit = as_text(elig)
 
-    phases_list = ensure_list(ps.get("designModule", {}).get("phases"))
-    phases_up = [str(p).upper() for p in phases_list]
-    conds_list = ensure_list(ps.get("conditionsModule", {}).get("conditions"))
-    title = (ps.get("identificationModule", {}) or {}).get("briefTitle", "")
+    sponsor = ""
+    lead = slm.get("leadSponsor") or _EMPTY
+    if isinstance(lead, dict):
+        sponsor = (lead.get("name") or "").strip()
+
+    brief_title = idm.get("briefTitle") or ""
+    return Study(
+        nct=(idm.get("nctId") or "").strip(),
+        title=(idm.get("officialTitle") or idm.get("briefTitle") or "").strip(),
+        brief_title=brief_title,
+        brief_title_lc=brief_title.lower(),
+        status_raw=(scm.get("overallStatus") or "").strip(),
+        phases=ensure_list(dsm.get("phases")),
+        conditions=ensure_list(cdnm.get("conditions")),
+        crit=crit,
+        crit_lc=crit.lower(),
+        min_age=min_age,
+        max_age=max_age,
+        sponsor=sponsor,
+        locations=ensure_list(clm.get("locations")),
+    )
+
+
+def score_trial(t: Any, intake: Dict[str, Any]) -> Tuple[int, List[str]]:
+    """Score a Study (or raw study dict) against the intake; returns (0..100, reasons)."""
+    study = t if isinstance(t, Study) else make_study(t)
+    intake = intake or _EMPTY
+    age_local = intake.get("age")
+    kps_local = intake.get("kps")
+    prior_bev_local = bool(intake.get("prior_bev", False))
+    setting_local = intake.get("setting") or ""
+    keywords_local = intake.get("keywords") or ""
+    diagnosis_local = intake.get("diagnosis") or ""
+
+    diag_terms, keywords_list = _score_terms(diagnosis_local, keywords_local)
+
+    crit = study.crit
+    min_age = study.min_age
+    max_age = study.max_age
+    title = study.brief_title
+    conds_list = study.conditions
+    # The API returns canonical tokens (PHASE1..PHASE4); also accept the spaced "PHASE 2" form
+    phases_set = {str(p).upper().replace(" ", "") for p in study.phases}
+
+    # Fixed phrases are plain substrings on the pre-lowered text; only user terms need regex
+    title_lc = study.brief_title_lc
+    crit_lc = study.crit_lc
 
     s = 0
     reasons: List[str] = []
-    if any(any(mentions(c, term) for term in diag_terms) for c in conds_list) or any(mentions(title, term) for term in diag_terms):
+    # " ; " keeps word boundaries at the joins identical to scanning each condition separately
+    if any_term(" ; ".join(c or "" for c in conds_list), diag_terms) or any_term(title, diag_terms):
         s += 30
         reasons.append(f"Matches diagnosis: {diagnosis_local or 'neuro-oncology'}.")
-    if any("PHASE 2" in p or "PHASE2" in p for p in phases_up):
+    if "PHASE2" in phases_set:
         s += 8
-    if any("PHASE 3" in p or "PHASE3" in p for p in phases_up):
+    if "PHASE3" in phases_set:
         s += 12
     try:
         if min_age is not None and age_local is not None and age_local < min_age:
@@ -160,55 +543,47 @@ def score_trial(t: Dict[str, Any], intake: Dict[str, Any]) -> Tuple[int, List[st
             s -= 30
     except Exception:
         pass
-    if mentions(crit, "ECOG 0-1") and (kps_local is None or kps_local < 80):
+    if "ecog 0-1" in crit_lc and (kps_local is None or kps_local < 80):
         s -= 15
         reasons.append("Requires ECOG 0–1 (KPS ~≥80).")
-    if mentions(crit, "Karnofsky") and (kps_local is None or kps_local < 70):
+    if "karnofsky" in crit_lc and (kps_local is None or kps_local < 70):
         s -= 10
         reasons.append("Requires KPS ≥70.")
-    if prior_bev_local and mentions(crit, "no prior bevacizumab"):
+    if prior_bev_local and "no prior bevacizumab" in crit_lc:
         s -= 25
         reasons.append("Excludes prior bevacizumab.")
-    if setting_local == "Recurrent" and mentions(crit, "recurrent"):
+    if setting_local == "Recurrent" and "recurrent" in crit_lc:
         s += 8
-    if setting_local == "Newly diagnosed" and (mentions(crit, "newly diagnosed") or mentions(title, "adjuvant")):
+    if setting_local == "Newly diagnosed" and ("newly diagnosed" in crit_lc or "adjuvant" in title_lc):
         s += 8
-    for kw in [k.strip() for k in (keywords_local or "").split(",") if k.strip()]:
-        if mentions(title, kw) or mentions(crit, kw):
-            s += 3
+    # Keyword bonus adds no reasons, so when even a full bonus leaves the score <= 0
+    # (clamped to 0 anyway, e.g. after an age mismatch) the scan can be skipped
+    if keywords_list and s + 3 * len(keywords_list) > 0:
+        # One scan over title and criteria; "\n" can't be part of a term, so nothing matches across it
+        kw_hits = find_terms(f"{title}\n{crit}", keywords_list)
+        for kw in keywords_list:
+            if kw in kw_hits:
+                s += 3
     return max(0, min(100, s)), reasons
 # python
-def extract_row(study: dict) -> dict:
+def extract_row(study: Any) -> dict:
     """Return a flat row dict for the table/PDF. Safe against missing fields."""
-    ps = (study.get("protocolSection") or {})
-    idm = (ps.get("identificationModule") or {})
-    scm = (ps.get("statusModule") or {})
-    dsm = (ps.get("designModule") or {})
-    cdnm = (ps.get("conditionsModule") or {})
-    slm = (ps.get("sponsorCollaboratorsModule") or {})
-    clm = (ps.get("contactsLocationsModule") or {})
-
-    title = (idm.get("officialTitle") or idm.get("briefTitle") or "").strip()
-    nct = (idm.get("nctId") or "").strip()
-
-    status_raw = (scm.get("overallStatus") or "").strip()
+    study = study if isinstance(study, Study) else make_study(study)
+    title = study.title
+    nct = study.nct
+
     # e.g., RECRUITING -> Recruiting
-    status = status_raw.replace("_", " ").title() if status_raw else ""
+    status = study.status_raw.replace("_", " ").title() if study.status_raw else ""
 
-    phases_list = ensure_list(dsm.get("phases"))
-    phases = ", ".join(phases_list)
+    phases = ", ".join(study.phases)
 
-    conditions = ", ".join(ensure_list(cdnm.get("conditions")))
+    conditions = ", ".join(study.conditions)
 
-    sponsor = ""
-    lead = slm.get("leadSponsor") or {}
-    if isinstance(lead, dict):
-        sponsor = (lead.get("name") or "").strip()
+    sponsor = study.sponsor
 
     city_country = ""
-    locs = ensure_list(clm.get("locations"))
-    if locs:
-        first = locs[0]
+    if study.locations:
+        first = study.locations[0]
         city = (first.get("locationCity") or "").strip()
         country = (first.get("locationCountry") or "").strip()
         parts = [p for p in [city, country] if p]
@@ -223,3 +598,50 @@ def extract_row(study: dict) -> dict:
         "sponsor": sponsor,
         "city_country": city_country,
     }
+
+
+# Frontends hide studies scoring below this (and report how many); 0 keeps every study
+MIN_SCORE = 0
+
+# (nctId, last update date) -> [Study, row or None until first needed, {intake key: (score, reasons)}];
+# reset when full
+STUDY_CACHE_MAX = 20000
+_parsed: Dict[Tuple[str, str], List[Any]] = {}
+
+
+def score_and_row(
+    raw: Dict[str, Any], intake: Dict[str, Any], min_score: Optional[int] = None
+) -> Tuple[int, List[str], Optional[Dict[str, Any]]]:
+    """`score_trial` plus `extract_row` for a raw study, memoized per study version and intake.
+
+    Re-running a search, or re-scoring the same studies with a changed intake, skips the
+    parse (and the scoring, for an intake seen before). The row is a fresh copy callers may
+    modify. If the score is below `min_score`, the row is not built and None is returned
+    in its place.
+    """
+    ps = (raw or _EMPTY).get("protocolSection") or _EMPTY
+    nct = (ps.get("identificationModule") or _EMPTY).get("nctId")
+    if not nct:
+        study = make_study(raw)
+        sc, reasons = score_trial(study, intake)
+        if min_score is not None and sc < min_score:
+            return sc, reasons, None
+        return sc, reasons, extract_row(study)
+    updated = ((ps.get("statusModule") or _EMPTY).get("lastUpdatePostDateStruct") or _EMPTY).get("date") or ""
+    key = (nct, updated)
+    entry = _parsed.get(key)
+    if entry is None:
+        if len(_parsed) >= STUDY_CACHE_MAX:
+            _parsed.clear()
+        entry = _parsed[key] = [make_study(raw), None, {}]
+    study, row, scores = entry
+    intake_key = tuple(sorted((intake or _EMPTY).items()))
+    hit = scores.get(intake_key)
+    if hit is None:
+        sc, reasons = score_trial(study, intake)
+        hit = scores[intake_key] = (sc, tuple(reasons))
+    if min_score is not None and hit[0] < min_score:
+        return hit[0], list(hit[1]), None
+    if row is None:
+        row = entry[1] = extract_row(study)
+    return hit[0], list(hit[1]), dict(row)
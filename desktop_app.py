@@ -1,24 +1,32 @@
 # python
 # Desktop GUI for Brain Trials Finder (no Streamlit)
 # Run with: python desktop_app.py
+import bisect
+import functools
+import queue
 import threading
+from operator import itemgetter
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import urllib.parse
-import webbrowser
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from ctgov_client import (
     DEFAULT_DIAG_TERMS,
     build_terms,
-    fetch_all_terms,
-    score_trial,
-    extract_row,
+    cached_fetch_terms,
+    MIN_SCORE,
+    score_and_row,
+    study_url,
     ensure_list,
 )
 from uk_sources import fetch_uk_trials
 
 STATUSES = ["RECRUITING", "NOT_YET_RECRUITING"]
+NIHR_SEARCH_URL = "https://www.bepartofresearch.nihr.ac.uk/results/search-results"
+ISRCTN_SEARCH_URL = "https://www.isrctn.com/search?q={}&countries=United%20Kingdom"
+CRUK_SEARCH_URL = "https://find.cancerresearchuk.org/clinical-trials?q={}"
+MAX_SHOWN = 300  # rows kept in the results tree
+STREAM_BATCH = 50  # scored rows handed to the UI thread at a time
 
 # Predefined NIHR UK location options for portal queries
 UK_NIHR_LOCATIONS = [
@@ -47,6 +55,83 @@ UK_NIHR_LOCATIONS = [
 ]
 
 
+# urllib.parse and webbrowser are only needed once a link is opened; import them then
+@functools.lru_cache(maxsize=64)
+def _quoted(text: str) -> str:
+    import urllib.parse
+
+    return urllib.parse.quote_plus(text)
+
+
+def _open_url(url: str) -> None:
+    import webbrowser
+
+    webbrowser.open_new_tab(url)
+
+
+def _contact_lines(study: Dict[str, Any]) -> List[str]:
+    """Text lines for the Contacts and Locations panel."""
+    ps = (study.get("protocolSection", {}) or {})
+    clm = (ps.get("contactsLocationsModule", {}) or {})
+    lines: List[str] = []
+
+    # Central contacts
+    centrals = ensure_list(clm.get("centralContacts"))
+    if centrals:
+        lines.append("Central Contacts:")
+        for c in centrals:
+            name = (c.get("name") or "").strip()
+            role = (c.get("role") or "").strip()
+            phone = (c.get("phone") or "").strip()
+            email = (c.get("email") or "").strip()
+            parts = [p for p in [name, role, phone, email] if p]
+            if parts:
+                lines.append("  - " + " | ".join(parts))
+
+    # Overall officials
+    officials = ensure_list(clm.get("overallOfficials"))
+    if officials:
+        lines.append("Overall Officials:")
+        for o in officials:
+            name = (o.get("name") or "").strip()
+            role = (o.get("role") or "").strip()
+            aff = (o.get("affiliation") or "").strip()
+            parts = [p for p in [name, role, aff] if p]
+            if parts:
+                lines.append("  - " + " | ".join(parts))
+
+    # Locations
+    locs = ensure_list(clm.get("locations"))
+    if locs:
+        lines.append("Locations:")
+        for L in locs:
+            facility = (L.get("locationFacility") or "").strip()
+            city = (L.get("locationCity") or "").strip()
+            state = (L.get("locationState") or "").strip()
+            country = (L.get("locationCountry") or "").strip()
+            status = (L.get("status") or "").strip()
+            site_line = ", ".join([p for p in [facility, city, state, country] if p])
+            if site_line:
+                if status:
+                    lines.append(f"  - {site_line} (status: {status})")
+                else:
+                    lines.append(f"  - {site_line}")
+            # per-location contacts
+            lcontacts = ensure_list(L.get("contacts")) or ensure_list(L.get("locationContacts"))
+            for lc in lcontacts:
+                lname = (lc.get("name") or "").strip()
+                lrole = (lc.get("role") or "").strip()
+                lphone = (lc.get("phone") or "").strip()
+                lemail = (lc.get("email") or "").strip()
+                parts = [p for p in [lname, lrole, lphone, lemail] if p]
+                if parts:
+                    lines.append("      • " + " | ".join(parts))
+
+    if not lines:
+        lines.append("No contacts/locations provided by sponsor at this time.")
+    return lines
+
+
 class BrainTrialsApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -88,11 +173,14 @@ class BrainTrialsApp(tk.Tk):
         ttk.Entry(frm, textvariable=self.keywords, width=32).grid(row=1, column=3, sticky=tk.W, pady=(6, 0))
 
         # Country filter (optional)
-        ttk.Label(frm, text="Country contains:").grid(row=1, column=4, sticky=tk.W, padx=(16, 6), pady=(6, 0))
+        ttk.Label(frm, text="Country name:").grid(row=1, column=4, sticky=tk.W, padx=(16, 6), pady=(6, 0))
         self.country = tk.StringVar(value="")
         ttk.Entry(frm, textvariable=self.country, width=18).grid(row=1, column=5, sticky=tk.W, pady=(6, 0))
         self.require_country = tk.BooleanVar(value=False)
         ttk.Checkbutton(frm, text="Require site in country", variable=self.require_country).grid(row=1, column=6, sticky=tk.W, pady=(6, 0))
+        # Bypass the result and HTTP caches for the next search; cleared once a search uses it
+        self.force_refresh = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frm, text="Force refresh", variable=self.force_refresh).grid(row=1, column=7, sticky=tk.W, pady=(6, 0))
 
         # Buttons
         self.btn_search = ttk.Button(frm, text="Search", command=self.on_search)
@@ -141,9 +229,17 @@ class BrainTrialsApp(tk.Tk):
         self.tree.bind("<<TreeviewSelect>>", self.on_select)
 
         # Store per-row mappings
-        self._url_by_item: Dict[str, str] = {}
-        self._study_by_item: Dict[str, Dict[str, Any]] = {}
+        # Tree item id -> its row; URL and study are read from the row when needed
+        self._row_by_item: Dict[str, Dict[str, Any]] = {}
+        self._contacts_by_nct: Dict[Any, str] = {}  # formatted contacts, reset with each result set
         self._current_rows: List[Dict[str, Any]] = []  # rows currently displayed
+        # While streaming: negated scores and item ids of the displayed rows, in display order
+        self._shown_keys: List[int] = []
+        self._shown_iids: List[str] = []
+        self._item_seq = 0
+        # Cancel flag of the running search (set when a newer search starts) and pending after() id
+        self._search_cancel: Optional[threading.Event] = None
+        self._pending_search: Optional[str] = None
 
         # Contacts and Locations panel
         infofrm = ttk.Labelframe(self, text="Contacts and Locations", padding=10)
@@ -157,8 +253,8 @@ class BrainTrialsApp(tk.Tk):
         infofrm.columnconfigure(0, weight=1)
         infofrm.rowconfigure(0, weight=1)
 
-        # Initial load (use lambda to satisfy type checkers)
-        self.after(100, lambda: self.on_search())
+        # Initial load
+        self._schedule_search(100)
 
     # ----- Portal helpers -----
     def _build_portal_query(self) -> str:
@@ -167,28 +263,26 @@ class BrainTrialsApp(tk.Tk):
             q = diag
         else:
             q = (self.keywords.get() or "").strip() or "brain tumour"
-        return urllib.parse.quote_plus(q)
+        return _quoted(q)
 
     def on_open_nihr(self):
         q = self._build_portal_query()
-        base = "https://www.bepartofresearch.nihr.ac.uk/results/search-results"
         loc_txt = (self.uk_location.get() or "").strip()
         if loc_txt:
-            loc = urllib.parse.quote_plus(loc_txt)
-            url = f"{base}?query={q}&location={loc}"
+            url = f"{NIHR_SEARCH_URL}?query={q}&location={_quoted(loc_txt)}"
         else:
-            url = f"{base}?query={q}"
-        webbrowser.open_new_tab(url)
+            url = f"{NIHR_SEARCH_URL}?query={q}"
+        _open_url(url)
 
     def on_open_isrctn(self):
         q = self._build_portal_query()
-        url = f"https://www.isrctn.com/search?q={q}&countries=United%20Kingdom"
-        webbrowser.open_new_tab(url)
+        url = ISRCTN_SEARCH_URL.format(q)
+        _open_url(url)
 
     def on_open_cruk(self):
         q = self._build_portal_query()
-        url = f"https://find.cancerresearchuk.org/clinical-trials?q={q}"
-        webbrowser.open_new_tab(url)
+        url = CRUK_SEARCH_URL.format(q)
+        _open_url(url)
 
     # ----- Actions -----
     def on_open(self, event=None):
@@ -196,9 +290,9 @@ class BrainTrialsApp(tk.Tk):
         if not sel:
             return
         for iid in sel:
-            url = self._url_by_item.get(iid)
+            url = self._row_by_item.get(iid, {}).get("url")
             if url:
-                webbrowser.open_new_tab(url)
+                _open_url(url)
                 break
 
     def on_select(self, event=None):
@@ -206,11 +300,29 @@ class BrainTrialsApp(tk.Tk):
         if not sel:
             return
         iid = sel[0]
-        study = self._study_by_item.get(iid)
+        study = self._row_by_item.get(iid, {}).get("study")
         if study:
             self._populate_contacts(study)
 
+    def _schedule_search(self, delay_ms: int = 300):
+        # Debounce: a burst of triggers collapses into one search after the last one
+        if self._pending_search is not None:
+            self.after_cancel(self._pending_search)
+        self._pending_search = self.after(delay_ms, self._run_scheduled_search)
+
+    def _run_scheduled_search(self):
+        self._pending_search = None
+        self.on_search()
+
+    def _new_search(self) -> threading.Event:
+        # Tell any running worker to stop and to leave the UI alone
+        if self._search_cancel is not None:
+            self._search_cancel.set()
+        self._search_cancel = threading.Event()
+        return self._search_cancel
+
     def on_search(self):
+        cancel = self._new_search()
         self.btn_search.configure(state=tk.DISABLED)
         self.btn_search_uk.configure(state=tk.DISABLED)
         self.status_lbl.configure(text="Fetching…")
@@ -222,32 +334,50 @@ class BrainTrialsApp(tk.Tk):
         keywords = self.keywords.get()
         country = self.country.get().strip()
         require_country = self.require_country.get()
+        refresh = self.force_refresh.get()
+        self.force_refresh.set(False)  # one-shot: only this search skips the caches
 
         def worker():
             try:
                 terms = build_terms(diagnosis, keywords)
-                studies = fetch_all_terms(terms, STATUSES, page_size=100, max_pages=5)
+                studies, truncated = cached_fetch_terms(
+                    terms, STATUSES, refresh=refresh, country=country if require_country else ""
+                )
+                # Scored rows go to the UI in batches so the table fills while scoring continues
+                if cancel.is_set():
+                    return
+                q: "queue.Queue" = queue.Queue()
+                self.after(0, self._start_streaming, q, cancel)
                 rows: List[Dict[str, Any]] = []
+                batch: List[Dict[str, Any]] = []
                 skipped = 0
+                hidden = 0
+                # Per-search constants, hoisted out of the per-study loop
+                country_cf = country.casefold() if country and require_country else ""
+                intake = {
+                    "age": age,
+                    "kps": kps,
+                    "prior_bev": prior_bev,
+                    "setting": setting,
+                    "keywords": keywords,
+                    "diagnosis": diagnosis,
+                }
                 for s in studies:
+                    if cancel.is_set():
+                        return
                     try:
                         ps = (s.get("protocolSection", {}) or {})
                         clm = (ps.get("contactsLocationsModule", {}) or {})
                         locs = ensure_list(clm.get("locations"))
-                        if country and require_country:
-                            locs = [L for L in locs if country.lower() in (L.get("locationCountry") or "").lower()]
+                        if country_cf:
+                            locs = [L for L in locs if country_cf in (L.get("locationCountry") or "").casefold()]
                         if require_country and not locs:
                             continue
-                        intake = {
-                            "age": age,
-                            "kps": kps,
-                            "prior_bev": prior_bev,
-                            "setting": setting,
-                            "keywords": keywords,
-                            "diagnosis": diagnosis,
-                        }
-                        sc, reasons = score_trial(s, intake)
-                        base = extract_row(s)
+                        # Studies below MIN_SCORE come back without a row, so none is built for them
+                        sc, reasons, base = score_and_row(s, intake, MIN_SCORE)
+                        if base is None:
+                            hidden += 1
+                            continue
                         # Ensure city_country exists (fallback from first location)
                         if not base.get("city_country"):
                             first = locs[0] if locs else None
@@ -260,20 +390,30 @@ class BrainTrialsApp(tk.Tk):
 
                         base["score"] = sc
                         base["reasons"] = "; ".join(reasons)
-                        base["url"] = f"https://clinicaltrials.gov/study/{base['nct']}" if base.get("nct") else ""
+                        base["url"] = study_url(base.get("nct"))
                         base["study"] = s
                         rows.append(base)
+                        batch.append(base)
+                        if len(batch) >= STREAM_BATCH:
+                            q.put(batch)
+                            batch = []
                     except Exception:
                         skipped += 1
                         continue
-                rows.sort(key=lambda x: -x.get("score", 0))
-                self.after(0, self._render_rows, rows, skipped, len(studies))
+                if batch:
+                    q.put(batch)
+                # The full ordering is only needed for export; the display is already sorted
+                rows.sort(key=itemgetter("score"), reverse=True)  # stable: ties keep fetch order
+                q.put((rows, skipped, len(studies), hidden, truncated))
             except Exception as e:
-                self.after(0, self._show_error, e)
+                if not cancel.is_set():
+                    self.after(0, self._show_error, e)
+                cancel.set()  # stops the queue consumer if it was already started
 
         threading.Thread(target=worker, daemon=True).start()
 
     def on_search_uk(self):
+        cancel = self._new_search()
         self.btn_search.configure(state=tk.DISABLED)
         self.btn_search_uk.configure(state=tk.DISABLED)
         self.status_lbl.configure(text="Fetching UK trials…")
@@ -284,6 +424,8 @@ class BrainTrialsApp(tk.Tk):
         prior_bev = self.prior_bev.get()
         keywords = self.keywords.get()
         use_ctgov = self.uk_use_ctgov.get()
+        refresh = self.force_refresh.get()
+        self.force_refresh.set(False)  # one-shot: only this search skips the caches
 
         def worker():
             try:
@@ -295,10 +437,14 @@ class BrainTrialsApp(tk.Tk):
                     "keywords": keywords,
                     "diagnosis": diagnosis,
                 }
-                rows, total_raw, skipped = fetch_uk_trials(diagnosis, keywords, intake, include_ctgov=use_ctgov)
-                self.after(0, self._render_rows, rows, skipped, total_raw)
+                rows, total_raw, skipped, hidden, truncated = fetch_uk_trials(
+                    diagnosis, keywords, intake, include_ctgov=use_ctgov, refresh=refresh
+                )
+                if not cancel.is_set():
+                    self.after(0, self._render_rows, rows, skipped, total_raw, hidden, truncated)
             except Exception as e:
-                self.after(0, self._show_error, e)
+                if not cancel.is_set():
+                    self.after(0, self._show_error, e)
 
         threading.Thread(target=worker, daemon=True).start()
 
@@ -309,102 +455,105 @@ class BrainTrialsApp(tk.Tk):
         self.status_lbl.configure(text="Error")
         messagebox.showerror("Error", f"Failed to fetch trials.\n{e}")
 
-    def _render_rows(self, rows: List[Dict[str, Any]], skipped: int, total: int):
-        # Clear
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
-        self._url_by_item.clear()
-        self._study_by_item.clear()
-        self._current_rows = rows[:]  # snapshot for export
-
-        # Insert
-        for r in rows[:300]:
-            values = (
-                r.get("score", 0),
-                r.get("title", ""),
-                r.get("sponsor", ""),
-                r.get("city_country", ""),
-                r.get("status", ""),
-                r.get("phases", ""),
-                r.get("conditions", ""),
-                r.get("nct", ""),
-            )
-            iid = self.tree.insert("", "end", values=values)
-            if r.get("url"):
-                self._url_by_item[iid] = r["url"]
-            if r.get("study"):
-                self._study_by_item[iid] = r["study"]
+    @staticmethod
+    def _row_values(r: Dict[str, Any]) -> tuple:
+        return (
+            r.get("score", 0),
+            r.get("title", ""),
+            r.get("sponsor", ""),
+            r.get("city_country", ""),
+            r.get("status", ""),
+            r.get("phases", ""),
+            r.get("conditions", ""),
+            r.get("nct", ""),
+        )
 
-        txt = f"Fetched {total} trials; showing {len(rows)} after filters."
+    def _start_streaming(self, q: "queue.Queue", cancel: threading.Event):
+        if cancel.is_set():
+            return
+        self.tree.delete(*self.tree.get_children())
+        self._current_rows = []  # until the worker finishes, there is nothing to export
+        self._row_by_item = {}
+        self._contacts_by_nct = {}
+        self._shown_keys = []
+        self._shown_iids = []
+        self.status_lbl.configure(text="Scoring…")
+        self._drain_queue(q, cancel)
+
+    def _drain_queue(self, q: "queue.Queue", cancel: threading.Event):
+        while True:
+            if cancel.is_set():  # superseded by a newer search, or the worker failed
+                return
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                self.after(30, self._drain_queue, q, cancel)
+                return
+            if isinstance(item, tuple):  # worker finished: (all rows sorted, skipped, total, hidden, truncated)
+                rows, skipped, total, hidden, truncated = item
+                self._current_rows = rows
+                self._finish_render(len(rows), skipped, total, hidden, truncated)
+                return
+            self._insert_sorted(item)
+
+    def _insert_sorted(self, batch: List[Dict[str, Any]]):
+        # Keep the tree ordered by score as rows arrive; ties stay in arrival order like a stable sort
+        for r in batch:
+            key = -r.get("score", 0)
+            pos = bisect.bisect_right(self._shown_keys, key)
+            if pos >= MAX_SHOWN:
+                continue
+            iid = f"s{self._item_seq}"
+            self._item_seq += 1
+            self._shown_keys.insert(pos, key)
+            self._shown_iids.insert(pos, iid)
+            self.tree.insert("", pos, iid=iid, values=self._row_values(r))
+            self._row_by_item[iid] = r
+            if len(self._shown_iids) > MAX_SHOWN:
+                self._shown_keys.pop()
+                dropped = self._shown_iids.pop()
+                self.tree.delete(dropped)
+                self._row_by_item.pop(dropped, None)
+
+    def _finish_render(self, shown: int, skipped: int, total: int, hidden: int, truncated: bool):
+        txt = f"Fetched {total} trials; showing {shown} after filters."
+        if truncated:
+            txt += " More matched than the page limit allows; narrow the search to see the rest."
+        if hidden:
+            txt += f" Hid {hidden} scoring below {MIN_SCORE}."
         if skipped:
             txt += f" Skipped {skipped}."
         self.status_lbl.configure(text=txt)
         self.btn_search.configure(state=tk.NORMAL)
         self.btn_search_uk.configure(state=tk.NORMAL)
 
+    def _render_rows(
+        self, rows: List[Dict[str, Any]], skipped: int, total: int, hidden: int, truncated: bool
+    ):
+        # Clear in one call; Tk redraws once when control returns to the event loop
+        self.tree.delete(*self.tree.get_children())
+        self._current_rows = rows  # kept for export; callers hand over ownership
+
+        # Insert with our own item ids so the lookup map is built up front
+        shown = rows[:MAX_SHOWN]
+        self._row_by_item = {f"r{i}": r for i, r in enumerate(shown)}
+        self._contacts_by_nct = {}
+        insert = self.tree.insert
+        for i, r in enumerate(shown):
+            insert("", "end", iid=f"r{i}", values=self._row_values(r))
+
+        self._finish_render(len(rows), skipped, total, hidden, truncated)
+
     def _populate_contacts(self, study: Dict[str, Any]):
-        ps = (study.get("protocolSection", {}) or {})
-        clm = (ps.get("contactsLocationsModule", {}) or {})
-        lines: List[str] = []
-
-        # Central contacts
-        centrals = ensure_list(clm.get("centralContacts"))
-        if centrals:
-            lines.append("Central Contacts:")
-            for c in centrals:
-                name = (c.get("name") or "").strip()
-                role = (c.get("role") or "").strip()
-                phone = (c.get("phone") or "").strip()
-                email = (c.get("email") or "").strip()
-                parts = [p for p in [name, role, phone, email] if p]
-                if parts:
-                    lines.append("  - " + " | ".join(parts))
-
-        # Overall officials
-        officials = ensure_list(clm.get("overallOfficials"))
-        if officials:
-            lines.append("Overall Officials:")
-            for o in officials:
-                name = (o.get("name") or "").strip()
-                role = (o.get("role") or "").strip()
-                aff = (o.get("affiliation") or "").strip()
-                parts = [p for p in [name, role, aff] if p]
-                if parts:
-                    lines.append("  - " + " | ".join(parts))
-
-        # Locations
-        locs = ensure_list(clm.get("locations"))
-        if locs:
-            lines.append("Locations:")
-            for L in locs:
-                facility = (L.get("locationFacility") or "").strip()
-                city = (L.get("locationCity") or "").strip()
-                state = (L.get("locationState") or "").strip()
-                country = (L.get("locationCountry") or "").strip()
-                status = (L.get("status") or "").strip()
-                site_line = ", ".join([p for p in [facility, city, state, country] if p])
-                if site_line:
-                    if status:
-                        lines.append(f"  - {site_line} (status: {status})")
-                    else:
-                        lines.append(f"  - {site_line}")
-                # per-location contacts
-                lcontacts = ensure_list(L.get("contacts")) or ensure_list(L.get("locationContacts"))
-                for lc in lcontacts:
-                    lname = (lc.get("name") or "").strip()
-                    lrole = (lc.get("role") or "").strip()
-                    lphone = (lc.get("phone") or "").strip()
-                    lemail = (lc.get("email") or "").strip()
-                    parts = [p for p in [lname, lrole, lphone, lemail] if p]
-                    if parts:
-                        lines.append("      • " + " | ".join(parts))
-
-        if not lines:
-            lines.append("No contacts/locations provided by sponsor at this time.")
+        # Contact text is built once per study per result set; reselecting a row is a dict lookup
+        nct = ((study.get("protocolSection") or {}).get("identificationModule") or {}).get("nctId") or id(study)
+        text = self._contacts_by_nct.get(nct)
+        if text is None:
+            text = self._contacts_by_nct[nct] = "\n".join(_contact_lines(study))
 
         self.contacts_text.config(state="normal")
         self.contacts_text.delete("1.0", tk.END)
-        self.contacts_text.insert(tk.END, "\n".join(lines))
+        self.contacts_text.insert(tk.END, text)
         self.contacts_text.config(state="disabled")
 
     # ----- PDF export -----
@@ -421,19 +570,27 @@ class BrainTrialsApp(tk.Tk):
         if not path:
             return
         try:
-            self._export_pdf(self._current_rows, path)
+            self._export_pdf(list(self._current_rows), path)  # shallow copy in case a search replaces the rows
             messagebox.showinfo("Save PDF", f"Saved: {path}")
         except Exception as e:
             messagebox.showerror("Save PDF", f"Failed to create PDF.\n{e}")
 
     def _export_pdf(self, rows: List[Dict[str, Any]], path: str):
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-        from reportlab.lib.units import mm
-
-        doc = SimpleDocTemplate(path, pagesize=A4, leftMargin=15 * mm, rightMargin=15 * mm, topMargin=15 * mm, bottomMargin=15 * mm)
+        from xml.sax.saxutils import escape
+        try:
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import A4, landscape
+            from reportlab.lib.styles import getSampleStyleSheet
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, LongTable, TableStyle
+            from reportlab.lib.units import mm
+        except ImportError as e:
+            raise RuntimeError("PDF export needs the reportlab package (pip install reportlab).") from e
+
+        doc = SimpleDocTemplate(
+            path, pagesize=landscape(A4), leftMargin=15 * mm, rightMargin=15 * mm, topMargin=15 * mm, bottomMargin=15 * mm
+        )
         styles = getSampleStyleSheet()
+        cell = styles["BodyText"].clone("cell", fontSize=8, leading=10)
         story = []
 
         story.append(Paragraph("Brain Cancer Trials – Results", styles["Title"]))
@@ -441,24 +598,39 @@ class BrainTrialsApp(tk.Tk):
         story.append(Paragraph(f"Total shown: {len(rows)}", styles["Normal"]))
         story.append(Spacer(1, 12))
 
+        # One table for all rows: only the wrapping columns (title, sponsor) need Paragraphs
+        data = [["Score", "Title", "NCT", "Sponsor", "City/Country", "Status", "Phases"]]
         for r in rows:
-            title = r.get("title", "")
             nct = r.get("nct", "")
-            sponsor = r.get("sponsor", "")
-            status = r.get("status", "")
-            phases = r.get("phases", "")
-            city_country = r.get("city_country", "")
-            score = r.get("score", 0)
-            url = f"https://clinicaltrials.gov/study/{nct}" if nct else ""
-            story.append(Paragraph(f"<b>{title}</b>", styles["Heading4"]))
-            meta = (
-                f"NCT: {nct or '—'} | Sponsor: {sponsor or '—'} | City/Country: {city_country or '—'} | "
-                f"Status: {status or '—'} | Phases: {phases or '—'} | Score: {score}"
-            )
-            story.append(Paragraph(meta, styles["Normal"]))
+            url = study_url(nct)
+            title = escape(r.get("title", ""))
             if url:
-                story.append(Paragraph(f"URL: <a href='{url}' color='blue'>{url}</a>", styles["Normal"]))
-            story.append(Spacer(1, 8))
+                title = f"<a href='{url}' color='blue'>{title}</a>"
+            data.append(
+                [
+                    r.get("score", 0),
+                    Paragraph(title, cell),
+                    nct or "—",
+                    Paragraph(escape(r.get("sponsor", "") or "—"), cell),
+                    r.get("city_country", "") or "—",
+                    r.get("status", "") or "—",
+                    r.get("phases", "") or "—",
+                ]
+            )
+        table = LongTable(data, colWidths=[14 * mm, 95 * mm, 26 * mm, 45 * mm, 35 * mm, 25 * mm, 27 * mm], repeatRows=1)
+        table.setStyle(
+            TableStyle(
+                [
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("FONTSIZE", (0, 0), (-1, -1), 8),
+                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                    ("ALIGN", (0, 0), (0, -1), "CENTER"),
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                    ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.grey),
+                ]
+            )
+        )
+        story.append(table)
 
         doc.build(story)
 
@@ -1,23 +1,24 @@
 # UK sources aggregator (initial: ClinicalTrials.gov UK filter)
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 from ctgov_client import (
+    MIN_SCORE,
     build_terms,
-    fetch_all_terms,
-    score_trial,
-    extract_row,
+    cached_fetch_terms,
+    score_and_row,
+    study_url,
 )
 
 STATUSES = ["RECRUITING", "NOT_YET_RECRUITING"]
+# locationCountry values (casefolded) that count as a UK site
+_UK_COUNTRIES = frozenset({"united kingdom", "uk", "england", "scotland", "wales", "northern ireland"})
 
 
-def _normalize_key(row: Dict[str, Any]) -> str:
-    # Prefer identifiers; fallback to normalized title
-    nct = (row.get("nct") or "").strip()
-    if nct:
-        return f"NCT:{nct}"
-    title = (row.get("title") or "").lower().strip()
-    return f"TITLE:{title}"
+def _first_uk_site(study: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # First UK location, found without building a filtered list per study
+    ps = (study.get("protocolSection", {}) or {})
+    locs = ((ps.get("contactsLocationsModule", {}) or {}).get("locations") or [])
+    return next((L for L in locs if (L.get("locationCountry") or "").strip().casefold() in _UK_COUNTRIES), None)
 
 
 def fetch_uk_trials(
@@ -25,56 +26,50 @@ def fetch_uk_trials(
     keywords: str,
     intake: Dict[str, Any],
     include_ctgov: bool = True,
-) -> Tuple[List[Dict[str, Any]], int, int]:
+    refresh: bool = False,
+) -> Tuple[List[Dict[str, Any]], int, int, int, bool]:
     """
     Fetch UK trials across selected sources.
     Currently implemented: ClinicalTrials.gov with UK site filter.
 
-    Returns: (rows, total_raw, skipped)
+    Returns: (rows, total_raw, skipped, hidden, truncated)
     rows: list of standard rows with keys: title, nct, status, phases, conditions, site, score, reasons, url
     total_raw: number of raw studies fetched before filters
     skipped: number of studies skipped due to formatting issues
+    hidden: number of studies left out for scoring below MIN_SCORE
+    truncated: True if more studies matched than the fetch page limit allowed
+    Fetches are served from the on-disk cache unless `refresh` is set.
     """
     terms = build_terms(diagnosis, keywords)
     rows: List[Dict[str, Any]] = []
     skipped = 0
+    hidden = 0
     total_raw = 0
+    truncated = False
 
     if include_ctgov:
-        studies = fetch_all_terms(terms, STATUSES, page_size=100, max_pages=5)
+        studies, truncated = cached_fetch_terms(terms, STATUSES, refresh=refresh, country="United Kingdom")
         total_raw += len(studies)
         for s in studies:
             try:
-                ps = (s.get("protocolSection", {}) or {})
-                locs = ((ps.get("contactsLocationsModule", {}) or {}).get("locations") or [])
-                # UK filter (case-insensitive contains)
-                uk_locs = [L for L in locs if "united kingdom" in (L.get("locationCountry") or "").lower()]
-                if not uk_locs:
+                first_site = _first_uk_site(s)
+                if first_site is None:
+                    continue
+                sc, reasons, base = score_and_row(s, intake, MIN_SCORE)
+                if base is None:
+                    hidden += 1
                     continue
-                sc, reasons = score_trial(s, intake)
-                base = extract_row(s)
                 # Replace site with first UK site
-                first_site = next(iter(uk_locs), {})
                 base["site"] = f"{first_site.get('locationFacility','')}, {first_site.get('locationCity','')}, {first_site.get('locationCountry','')}"
                 base["score"] = sc
                 base["reasons"] = "; ".join(reasons)
-                base["url"] = f"https://clinicaltrials.gov/study/{base['nct']}" if base.get("nct") else ""
+                base["url"] = study_url(base.get("nct"))
                 rows.append(base)
             except Exception:
                 skipped += 1
                 continue
 
-    # Deduplicate
-    seen = set()
-    deduped: List[Dict[str, Any]] = []
-    for r in rows:
-        k = _normalize_key(r)
-        if k in seen:
-            continue
-        seen.add(k)
-        deduped.append(r)
-
-    # Sort
-    deduped.sort(key=lambda x: -x.get("score", 0))
-    return deduped, total_raw, skipped
+    # No dedupe pass: fetch_terms already returns each NCT id once, before any scoring
+    rows.sort(key=lambda x: -x.get("score", 0))
+    return rows, total_raw, skipped, hidden, truncated
 